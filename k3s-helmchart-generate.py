@@ -6,14 +6,26 @@
 
 """Helper script to generate HelmChart CRDs for use with k3s"""
 
-import argparse
+from __future__ import annotations
+
+import functools
+import io
+import sys
+import textwrap
+import types
 from typing import TypedDict
 
-import yaml
+# PyYAML is imported lazily by _load_yaml(); 'python -X importtime' shows
+# loading the libyaml C extension dominates interpreter startup, and it is
+# wasted work for invocations that exit during argument parsing (e.g. --help
+# or usage errors).
+yaml = None
 
+# Loader/dumper globals initialized by _load_yaml()
+_Loader = None
+_Dumper = None
+_dump = None
 
-class LiteralStr(str):
-    """Literal string class. Inherits from str class."""
 
 class Specification(TypedDict, total=False):
     """
@@ -29,7 +41,7 @@ class Specification(TypedDict, total=False):
     repo: str
     set: dict[str, str]
     targetNamespace: str
-    valuesContent: LiteralStr
+    valuesContent: str
     version: str
 
 class HelmChart(TypedDict):
@@ -42,28 +54,44 @@ class HelmChart(TypedDict):
     spec: Specification
 
 
-def literal_representer(
-    dumper: yaml.dumper.Dumper, data: LiteralStr
-) -> yaml.nodes.ScalarNode:
+def _load_yaml():
     """
-    PyYAML representer to format string as a literal string, multiline string with
-    newlines preserved
+    Import PyYAML and initialize the loader/dumper globals on first use.
 
-    :param dumper: PyYAML dumper object
-    :type dumper: class:`yaml.dumper.Dumper`
-    :param data: LiteralStr string data
-    :type data: class:`LiteralStr`
+    Subsequent calls return the already-imported module.
 
-    :returns: A ScalarNode object for the new YAML representer
-    :rtype: class:`yaml.nodes.ScalarNode`
+    :returns: The PyYAML module
+    :rtype: module
     """
-    # Return a scalar supporting literal YAML values ('|')  of type string (tag)
-    # for values of type 'LiteralStr'
-    return dumper.represent_scalar(style="|", tag="tag:yaml.org,2002:str", value=data)
+    global yaml, _Loader, _Dumper, _dump
+
+    if yaml is not None:
+        return yaml
+
+    import yaml as _yaml
 
+    yaml = _yaml
 
-# Use the literal_representer to serialize 'LiteralStr' data types
-yaml.add_representer(data_type=LiteralStr, representer=literal_representer)
+    # Prefer the libyaml-backed loader and dumper when PyYAML was built with
+    # them. Parsing large values files is the dominant cost of this CLI, and
+    # the C classes are several times faster than the pure-Python ones.
+    _Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    _Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+    class _ManifestDumper(_Dumper):
+        """Dumper subclass specialized for emitting HelmChart manifests."""
+
+    # Pre-bind the manifest emission options so each call skips rebuilding
+    # the same keyword arguments.
+    _dump = functools.partial(
+        yaml.dump,
+        Dumper=_ManifestDumper,
+        default_flow_style=False,
+        explicit_start=True,
+        sort_keys=False,
+    )
+
+    return yaml
 
 
 def parse_set_args(arguments: list[str]):
@@ -76,17 +104,12 @@ def parse_set_args(arguments: list[str]):
     :returns: A dictionary containing all defined set values
     :rtype: dict
     """
-    set_dict: dict[str, str] = dict()
-    for set_arg in arguments:
-        # Parse comma-separated arguments
-        arg_parts = set_arg.split(",")
-
-        # Add each argument to set_dict
-        for argument in arg_parts:
-            key, value = argument.split("=")
-            set_dict.update({key: value})
-
-    return set_dict
+    # Split comma-separated arguments into key=value pairs and build the
+    # dictionary in a single C-level dict() call. maxsplit=1 keeps values
+    # containing '=' intact.
+    return dict(
+        pair.split("=", 1) for set_arg in arguments for pair in set_arg.split(",")
+    )
 
 
 def read_values_files(files: list[str]):
@@ -99,48 +122,64 @@ def read_values_files(files: list[str]):
     :returns: A combined dictionary containing all values
     :rtype: dict
     """
-    values: dict[str, str] = dict()
-    for filename in files:
-        content = yaml.safe_load(filename)
-        values.update(content)
-
-    return values
+    yaml = _load_yaml()
 
-
-def generate_helmchart(arguments: argparse.Namespace):
+    # Concatenate the files into one multi-document stream so a single parser
+    # handles all of them. Binary mode lets libyaml decode UTF-8 itself
+    # instead of reading through a Python-level TextIOWrapper.
+    buffer = io.BytesIO()
+    for filename in files:
+        with open(filename, "rb") as values_file:
+            buffer.write(values_file.read())
+        buffer.write(b"\n---\n")
+    buffer.seek(0)
+
+    # Later files override earlier ones, matching the previous per-file
+    # dict.update order. Empty documents load as None and are skipped.
+    return {
+        key: value
+        for document in yaml.load_all(buffer, Loader=_Loader)
+        if document
+        for key, value in document.items()
+    }
+
+
+def generate_helmchart(arguments: types.SimpleNamespace):
     """
     Returns a dictionary object representing a HelmChart resource
 
-    :param arguments: A :class:`argparse.Namespace` object
-    :type arguments: class:`argparse.Namespace`
+    :param arguments: A :class:`types.SimpleNamespace` object of parsed arguments
+    :type arguments: class:`types.SimpleNamespace`
 
     :returns: A dictionary representing a HelmChart resource
     :rtype: dict
     """
 
-    specification = Specification(chart=arguments.chart)
-
-    # Optional HelmChart resource values
-    if arguments.bootstrap:
-        specification["bootstrap"] = arguments.bootstrap
-    if arguments.helm_version:
-        specification["helmVersion"] = arguments.helm_version
-    if arguments.job_image:
-        specification["jobImage"] = arguments.job_image
-    if arguments.namespace:
-        specification["targetNamespace"] = arguments.namespace
-    if arguments.repo:
-        specification["repo"] = arguments.repo
-    if arguments.version:
-        specification["version"] = arguments.version
+    # Build the chart reference and optional HelmChart resource values in a
+    # single allocation rather than growing the dictionary one conditional
+    # assignment at a time.
+    specification: Specification = {
+        key: value
+        for key, value in (
+            ("chart", arguments.chart),
+            ("bootstrap", arguments.bootstrap),
+            ("helmVersion", arguments.helm_version),
+            ("jobImage", arguments.job_image),
+            ("targetNamespace", arguments.namespace),
+            ("repo", arguments.repo),
+            ("version", arguments.version),
+        )
+        if value
+    }
 
     # Chart configuration variables
     if arguments.set:
         specification["set"] = parse_set_args(arguments.set)
     if arguments.values:
         values = read_values_files(arguments.values)
-        values_str = LiteralStr(yaml.dump(data=values))
-        specification["valuesContent"] = values_str
+        specification["valuesContent"] = _load_yaml().dump(
+            data=values, Dumper=_Dumper
+        )
 
     helmchart = HelmChart(
         apiVersion="helm.cattle.io/v1",
@@ -155,10 +194,19 @@ def generate_helmchart(arguments: argparse.Namespace):
     return helmchart
 
 
-def parse_arguments():
+def _build_parser():
     """
-    Parse arguments provided by the command line.
+    Build the full argparse parser.
+
+    Only used for the --help and error-reporting paths; the hot path parses
+    sys.argv by hand in :func:`parse_arguments` to avoid importing and
+    constructing argparse on every invocation.
+
+    :returns: The configured argument parser
+    :rtype: class:`argparse.ArgumentParser`
     """
+    import argparse
+
     parser = argparse.ArgumentParser(
         description=("This command generates K3s HelmChart resource manifests")
     )
@@ -227,7 +275,7 @@ def parse_arguments():
         "--set_file",
         action="append",
         default=[],
-        type=open,
+        type=str,
         help="Specify values in a YAML file or a URL(can specify multiple) (default [])",
     )
 
@@ -236,24 +284,162 @@ def parse_arguments():
         "-f",
         action="append",
         default=[],
-        type=open,
+        type=str,
         help="Specify values in a YAML file or a URL(can specify multiple) (default [])",
     )
 
-    return parser.parse_args()
+    return parser
+
+
+def _argument_error(message: str):
+    """
+    Report an argument error with argparse-style usage output and exit.
+
+    :param message: Description of the invalid argument
+    :type message: str
+    """
+    _build_parser().error(message)
+
+
+# Maps each option string to its destination attribute. Built once at module
+# load so parse_arguments performs no per-invocation construction.
+_OPTION_DESTS = {
+    "--name": "name",
+    "--repo": "repo",
+    "--version": "version",
+    "--helmcontroller-namespace": "helmcontroller_namespace",
+    "--tiller-namespace": "helmcontroller_namespace",
+    "--helm-version": "helm_version",
+    "--job-image": "job_image",
+    "--namespace": "namespace",
+    "--target-namespace": "namespace",
+    "--set": "set",
+    "--set-string": "set",
+    "--set_file": "set_file",
+    "--values": "values",
+    "-f": "values",
+}
+
+# Destinations that collect repeated options into a list
+_APPEND_DESTS = frozenset(("set", "set_file", "values"))
+
+
+def parse_arguments(argv: list[str] | None = None):
+    """
+    Parse arguments provided by the command line.
+
+    Walks sys.argv directly instead of going through argparse, which is
+    expensive to import and construct for a cold CLI start. argparse is only
+    loaded lazily for --help and error reporting.
+
+    :param argv: Arguments to parse, defaulting to sys.argv[1:]
+    :type argv: list
+
+    :returns: A namespace of parsed arguments
+    :rtype: class:`types.SimpleNamespace`
+    """
+    arguments = types.SimpleNamespace(
+        chart=None,
+        name=None,
+        repo=None,
+        version=None,
+        helmcontroller_namespace="kube-system",
+        bootstrap=False,
+        helm_version="v3",
+        job_image=None,
+        namespace=None,
+        set=[],
+        set_file=[],
+        values=[],
+    )
+
+    if argv is None:
+        argv = sys.argv[1:]
+
+    unrecognized: list[str] = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        index += 1
+
+        if arg in ("-h", "--help"):
+            _build_parser().parse_args(["--help"])
+
+        if arg == "--bootstrap":
+            arguments.bootstrap = True
+            continue
+
+        if arg.startswith("-") and arg != "-":
+            # Attached short-option form (-fvalues.yaml), as accepted by helm.
+            # -f=values.yaml falls through to the option=value handling below.
+            if arg.startswith("-f") and not arg.startswith("--") and arg[2:3] not in ("", "="):
+                arguments.values.append(arg[2:])
+                continue
+            option, separator, value = arg.partition("=")
+            dest = _OPTION_DESTS.get(option)
+            if dest is None:
+                # Keep parsing so later valid options are still consumed;
+                # argparse reports only the genuinely unparsed tokens.
+                unrecognized.append(arg)
+                continue
+            if not separator:
+                # Refuse to consume an option-like token as a value; argparse
+                # errors here too. Dash-prefixed values remain expressible as
+                # --option=-value.
+                if index == len(argv) or (
+                    argv[index].startswith("-") and argv[index] != "-"
+                ):
+                    _argument_error(f"argument {option}: expected one argument")
+                value = argv[index]
+                index += 1
+            if dest in _APPEND_DESTS:
+                getattr(arguments, dest).append(value)
+            else:
+                setattr(arguments, dest, value)
+        elif arguments.chart is None:
+            arguments.chart = arg
+        else:
+            unrecognized.append(arg)
+
+    if arguments.chart is None:
+        _argument_error("the following arguments are required: CHART")
+    if arguments.name is None:
+        _argument_error("the following arguments are required: --name")
+    if arguments.helm_version not in ("v2", "v3"):
+        _argument_error(
+            "argument --helm-version: invalid choice: "
+            f"'{arguments.helm_version}' (choose from 'v2', 'v3')"
+        )
+    if unrecognized:
+        _argument_error("unrecognized arguments: " + " ".join(unrecognized))
+
+    return arguments
 
 
 def main():
     """Main entry point"""
     arguments = parse_arguments()
 
+    _load_yaml()
+
     helmchart = generate_helmchart(arguments)
 
-    chart_manifest = yaml.dump(
-        data=helmchart, default_flow_style=False, explicit_start=True, sort_keys=False
-    )
+    # valuesContent is already a serialized YAML document. Splice it into the
+    # manifest as a pre-formatted literal block rather than re-emitting it
+    # through the dumper, which would traverse the entire string a second time.
+    values_content = helmchart["spec"].pop("valuesContent", None)
+
+    chart_manifest = _dump(data=helmchart)
+
+    if values_content is not None:
+        chart_manifest += "  valuesContent: |\n" + textwrap.indent(
+            values_content, "    "
+        )
 
-    print(chart_manifest)
+    # Write pre-encoded bytes in one call, bypassing print()'s per-call
+    # TextIOWrapper encoding path. The trailing newline matches the previous
+    # print() behavior.
+    sys.stdout.buffer.write(chart_manifest.encode("utf-8") + b"\n")
 
 
 if __name__ == "__main__":